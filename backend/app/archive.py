@@ -0,0 +1,250 @@
+# backend/app/archive.py
+import argparse
+import gzip
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session, selectinload
+
+from . import models
+from .database import SessionLocal
+
+# expenses older than this many whole months are moved out of MySQL
+ARCHIVE_MONTHS = int(os.getenv("EXPENSE_ARCHIVE_MONTHS", "12"))
+ARCHIVE_BATCH_SIZE = 1000
+
+# NOT under media/ -- that folder is served publicly
+ARCHIVE_ROOT = os.path.join(os.path.dirname(os.path.dirname(__file__)), "archive", "expenses")
+
+COLUMNS = [
+    "id",
+    "user_id",
+    "amount",
+    "currency",
+    "category",
+    "description",
+    "ocr_text",
+    "spent_at",
+    "created_at",
+    "receipt_images",
+]
+DATETIME_COLUMNS = ("spent_at", "created_at")
+
+
+def archive_cutoff(now: Optional[datetime] = None, months: int = ARCHIVE_MONTHS) -> datetime:
+    # always the first day of a month, so every archived month file is complete
+    now = now or datetime.utcnow()
+    index = now.year * 12 + (now.month - 1) - months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def _month_path(user_id: int, year: int, month: int) -> str:
+    return os.path.join(ARCHIVE_ROOT, f"user{user_id}", f"{year:04d}-{month:02d}.json.gz")
+
+
+def _index_path(user_id: int) -> str:
+    return os.path.join(ARCHIVE_ROOT, f"user{user_id}", "index.json")
+
+
+def _month_of(filename: str) -> Optional[Tuple[int, int]]:
+    if not filename.endswith(".json.gz"):
+        return None
+    try:
+        year, month = filename[: -len(".json.gz")].split("-")
+        return int(year), int(month)
+    except ValueError:
+        return None
+
+
+# ---------- FILE FORMAT ----------
+# one gzip file per user per month, stored column-wise:
+# {"id": [...], "amount": [...], ...} -- key names are written once, not per row
+
+def _read_month(path: str) -> List[dict]:
+    if not os.path.exists(path):
+        return []
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        columns = json.load(f)
+
+    rows = [dict(zip(COLUMNS, values)) for values in zip(*(columns[c] for c in COLUMNS))]
+    for row in rows:
+        for c in DATETIME_COLUMNS:
+            if row[c] is not None:
+                row[c] = datetime.fromisoformat(row[c])
+    return rows
+
+
+def _write_month(path: str, rows: List[dict]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    columns = {c: [] for c in COLUMNS}
+    for row in sorted(rows, key=lambda r: r["spent_at"] or datetime.min, reverse=True):
+        for c in COLUMNS:
+            value = row[c]
+            if c in DATETIME_COLUMNS and value is not None:
+                value = value.isoformat()
+            columns[c].append(value)
+
+    # write next to the target and swap in, so readers never see a half-written file
+    tmp_path = path + ".tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        json.dump(columns, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+# per-user lookup so single-row reads open one month file, not the whole archive:
+# {"expenses": {"<expense id>": "YYYY-MM"}, "receipts": {"<image id>": <expense id>}}
+def _read_index(user_id: int) -> dict:
+    path = _index_path(user_id)
+    if not os.path.exists(path):
+        return {"expenses": {}, "receipts": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_index(user_id: int, index: dict) -> None:
+    path = _index_path(user_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def _expense_row(expense: models.Expense) -> dict:
+    return {
+        "id": expense.id,
+        "user_id": expense.user_id,
+        "amount": expense.amount,
+        "currency": expense.currency,
+        "category": expense.category,
+        "description": expense.description,
+        "ocr_text": expense.ocr_text,
+        "spent_at": expense.spent_at,
+        "created_at": expense.created_at,
+        "receipt_images": [
+            {"id": img.id, "file_path": img.file_path} for img in expense.receipt_images
+        ],
+    }
+
+
+# ---------- ARCHIVE JOB ----------
+def archive_expenses(db: Session, cutoff: Optional[datetime] = None) -> int:
+    cutoff = cutoff or archive_cutoff()
+    moved = 0
+
+    while True:
+        batch = (
+            db.query(models.Expense)
+            .options(selectinload(models.Expense.receipt_images))
+            .filter(models.Expense.spent_at < cutoff)
+            .order_by(models.Expense.id)
+            .limit(ARCHIVE_BATCH_SIZE)
+            .all()
+        )
+        if not batch:
+            break
+
+        groups: Dict[Tuple[int, int, int], List[dict]] = {}
+        for expense in batch:
+            key = (expense.user_id, expense.spent_at.year, expense.spent_at.month)
+            groups.setdefault(key, []).append(_expense_row(expense))
+
+        # files first, then delete: if we crash in between, the next run
+        # re-archives the same rows and the merge by id drops the duplicates
+        indexes: Dict[int, dict] = {}
+        for (user_id, year, month), rows in groups.items():
+            path = _month_path(user_id, year, month)
+            merged = {row["id"]: row for row in _read_month(path)}
+            merged.update({row["id"]: row for row in rows})
+            _write_month(path, list(merged.values()))
+
+            index = indexes.setdefault(user_id, _read_index(user_id))
+            for row in rows:
+                index["expenses"][str(row["id"])] = f"{year:04d}-{month:02d}"
+                for img in row["receipt_images"]:
+                    index["receipts"][str(img["id"])] = row["id"]
+
+        for user_id, index in indexes.items():
+            _write_index(user_id, index)
+
+        for expense in batch:
+            db.delete(expense)
+        db.commit()
+        moved += len(batch)
+
+    return moved
+
+
+# ---------- READ-THROUGH ----------
+def read_archived_expenses(
+    user_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> List[dict]:
+    user_dir = os.path.join(ARCHIVE_ROOT, f"user{user_id}")
+    if not os.path.isdir(user_dir):
+        return []
+
+    first = (start.year, start.month) if start else None
+    last = (end.year, end.month) if end else None
+
+    results = []
+    for filename in sorted(os.listdir(user_dir), reverse=True):
+        month = _month_of(filename)
+        if month is None:
+            continue
+        if (first and month < first) or (last and month > last):
+            continue
+
+        for row in _read_month(os.path.join(user_dir, filename)):
+            if start and row["spent_at"] < start:
+                continue
+            if end and row["spent_at"] > end:
+                continue
+            results.append(row)
+
+    return results
+
+
+def find_archived_expense(user_id: int, expense_id: int) -> Optional[dict]:
+    archived_month = _read_index(user_id)["expenses"].get(str(expense_id))
+    if archived_month is None:
+        return None
+
+    year, month = (int(part) for part in archived_month.split("-"))
+    for row in _read_month(_month_path(user_id, year, month)):
+        if row["id"] == expense_id:
+            return row
+    return None
+
+
+def find_archived_receipt(user_id: int, image_id: int) -> Optional[dict]:
+    expense_id = _read_index(user_id)["receipts"].get(str(image_id))
+    if expense_id is None:
+        return None
+
+    expense = find_archived_expense(user_id, expense_id)
+    if expense is None:
+        return None
+    for img in expense["receipt_images"]:
+        if img["id"] == image_id:
+            return img
+    return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move old expenses into the on-disk archive")
+    parser.add_argument("--months", type=int, default=ARCHIVE_MONTHS)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        cutoff = archive_cutoff(months=args.months)
+        count = archive_expenses(db, cutoff)
+        print(f"archived {count} expenses spent before {cutoff.date()}")
+    finally:
+        db.close()
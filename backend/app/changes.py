@@ -0,0 +1,119 @@
+# backend/app/changes.py
+import asyncio
+import itertools
+import json
+from typing import Dict, Optional, Set
+
+from fastapi import Request
+from pydantic import BaseModel
+
+# events buffered per connection before a slow client is told to resync
+CHANGE_BUFFER_SIZE = 64
+KEEPALIVE_SECONDS = 15
+# open /changes streams per user; /changes skips the rate limiter, so this is its bound
+MAX_STREAMS_PER_USER = 5
+
+RESYNC = {"op": "resync"}
+
+
+class Subscription:
+    def __init__(self, user_id: int, buffer_size: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+        # numbered per connection, so a client can spot gaps in its own feed
+        self.seq = itertools.count(1)
+
+    def offer(self, event: dict) -> None:
+        try:
+            self.queue.put_nowait({"seq": next(self.seq), **event})
+        except asyncio.QueueFull:
+            # never block the publisher on a slow reader: drop what is buffered
+            # and tell the client to refetch once it catches up
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"seq": next(self.seq), **RESYNC})
+
+
+# in-process fan-out of change events to every open /changes connection of a user
+class ChangeBroker:
+    def __init__(
+        self,
+        buffer_size: int = CHANGE_BUFFER_SIZE,
+        max_streams: int = MAX_STREAMS_PER_USER,
+    ):
+        self.buffer_size = buffer_size
+        self.max_streams = max_streams
+        self.subscribers: Dict[int, Set[Subscription]] = {}
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # None when the user already has max_streams open
+    def subscribe(self, user_id: int) -> Optional[Subscription]:
+        self.loop = asyncio.get_running_loop()
+        subs = self.subscribers.setdefault(user_id, set())
+        if len(subs) >= self.max_streams:
+            return None
+        sub = Subscription(user_id, self.buffer_size)
+        subs.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        subs = self.subscribers.get(sub.user_id)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self.subscribers[sub.user_id]
+
+    def publish(self, user_id: int, event: dict) -> None:
+        # sync routes run in the threadpool, so hop onto the event loop if needed
+        if user_id not in self.subscribers or self.loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            self._deliver(user_id, event)
+        else:
+            self.loop.call_soon_threadsafe(self._deliver, user_id, event)
+
+    def _deliver(self, user_id: int, event: dict) -> None:
+        for sub in self.subscribers.get(user_id, ()):
+            sub.offer(event)
+
+
+broker = ChangeBroker()
+
+
+def publish_change(
+    user_id: int,
+    entity: str,
+    op: str,
+    entity_id: int,
+    data: Optional[BaseModel] = None,
+) -> None:
+    # call only after db.commit(), so clients never see uncommitted rows
+    event = {"entity": entity, "op": op, "id": entity_id}
+    if data is not None:
+        event["data"] = data.model_dump(mode="json")
+    broker.publish(user_id, event)
+
+
+def _sse(event: dict) -> str:
+    return f"data: {json.dumps(event, separators=(',', ':'))}\n\n"
+
+
+async def change_stream(request: Request, sub: Subscription):
+    # nothing is replayed across reconnects, so every new stream starts with a resync
+    sub.offer(RESYNC)
+    try:
+        while not await request.is_disconnected():
+            try:
+                # a timer on the current task, not an extra task per connection like wait_for
+                async with asyncio.timeout(KEEPALIVE_SECONDS):
+                    event = await sub.queue.get()
+            except TimeoutError:
+                yield ": ping\n\n"
+                continue
+            yield _sse(event)
+    finally:
+        broker.unsubscribe(sub)
@@ -0,0 +1,84 @@
+# backend/app/compact.py
+import json
+from typing import Iterable, Type
+
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional, the JSON variant still works without it
+    msgpack = None
+
+# opt-in list format, selected with the Accept header:
+#   {"columns": ["id", "amount", ...], "rows": [[1, 12.5, ...], ...]}
+# key names are sent once instead of on every row
+COLUMNS_JSON = "application/vnd.expeapp.columns+json"
+COLUMNS_MSGPACK = "application/vnd.expeapp.columns+msgpack"
+
+
+def to_columns(items: Iterable, schema: Type[BaseModel]) -> dict:
+    columns = list(schema.model_fields)
+    rows = []
+    for item in items:
+        data = schema.model_validate(item).model_dump(mode="json")
+        rows.append([data[c] for c in columns])
+    return {"columns": columns, "rows": rows}
+
+
+def _accepted_media_types(header: str) -> dict:
+    accepted = {}
+    for part in header.split(","):
+        media_type, *params = part.split(";")
+        media_type = media_type.strip().lower()
+        if not media_type:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[media_type] = q
+    return accepted
+
+
+def choose_list_format(header: str) -> str:
+    # no Accept header at all means plain JSON
+    if not header.strip():
+        return "application/json"
+
+    accepted = _accepted_media_types(header)
+    json_q = max(
+        accepted.get("application/json", 0.0),
+        accepted.get("application/*", 0.0),
+        accepted.get("*/*", 0.0),
+    )
+
+    # wildcards never opt into the compact formats -- they have to be named
+    best, best_q = "application/json", json_q
+    candidates = [COLUMNS_JSON] + ([COLUMNS_MSGPACK] if msgpack is not None else [])
+    for media_type in candidates:
+        q = accepted.get(media_type, 0.0)
+        if q > 0 and q >= best_q:
+            best, best_q = media_type, q
+    return best
+
+
+def compact_response(request: Request, items, schema: Type[BaseModel]) -> Response:
+    media_type = choose_list_format(request.headers.get("accept", ""))
+
+    if media_type == COLUMNS_MSGPACK:
+        body = msgpack.packb(to_columns(items, schema), use_bin_type=True)
+    elif media_type == COLUMNS_JSON:
+        body = json.dumps(to_columns(items, schema), separators=(",", ":"))
+    else:
+        # plain JSON list, same shape the route's response_model describes
+        data = [schema.model_validate(item).model_dump(mode="json") for item in items]
+        body = json.dumps(data, separators=(",", ":"))
+
+    # the body depends on Accept, so shared caches must key on it
+    return Response(content=body, media_type=media_type, headers={"Vary": "Accept"})
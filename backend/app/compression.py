@@ -0,0 +1,96 @@
+# backend/app/compression.py
+import gzip
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip still works without it
+    brotli = None
+
+from .compact import COLUMNS_JSON, COLUMNS_MSGPACK
+from .middleware import HTTPMiddleware
+
+# below this, compression overhead isn't worth it on the phone
+COMPRESS_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4  # higher levels are too slow for per-request use
+
+# images/receipts are already compressed; the change feed must stream
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "text/html",
+    "text/plain",
+    COLUMNS_JSON,
+    COLUMNS_MSGPACK,
+}
+
+
+def _accepted_encodings(header: str) -> dict:
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+def choose_encoding(header: str):
+    accepted = _accepted_encodings(header)
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+
+    best, best_q = None, 0.0
+    for name in candidates:
+        q = accepted.get(name, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class CompressionMiddleware(HTTPMiddleware):
+    def __init__(self, app, minimum_size: int = COMPRESS_MIN_SIZE):
+        super().__init__(app)
+        self.minimum_size = minimum_size
+
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+
+        content_type = response.headers.get("content-type", "").split(";")[0].strip()
+        if content_type not in COMPRESSIBLE_TYPES or "content-encoding" in response.headers:
+            return response
+
+        # let caches/proxies know the body depends on Accept-Encoding
+        response.headers.add_vary_header("Accept-Encoding")
+
+        encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+        if encoding is None:
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        # raw_headers keeps repeated headers (e.g. several Set-Cookie) intact
+        headers = [(k, v) for k, v in response.raw_headers if k.lower() != b"content-length"]
+
+        if len(body) >= self.minimum_size:
+            body = compress(body, encoding)
+            headers.append((b"content-encoding", encoding.encode()))
+        headers.append((b"content-length", str(len(body)).encode()))
+
+        result = Response(content=body, status_code=response.status_code)
+        result.raw_headers = headers
+        return result
@@ -1,13 +1,16 @@
 import os
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File, Form
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 
 from . import models, schemas
+from .archive import find_archived_expense, find_archived_receipt, read_archived_expenses
 from .auth import get_current_user
+from .changes import publish_change
+from .compact import compact_response
 from .database import get_db
 
 router = APIRouter(prefix="/expenses", tags=["expenses"])
@@ -16,6 +19,13 @@ MEDIA_ROOT = os.path.join(os.path.dirname(os.path.dirname(__file__)), "media", "
 os.makedirs(MEDIA_ROOT, exist_ok=True)
 
 
+def _naive_utc(dt: Optional[datetime]) -> Optional[datetime]:
+    # spent_at is stored as naive UTC
+    if dt is not None and dt.tzinfo is not None:
+        return dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
 @router.post("/", response_model=schemas.ExpenseOut)
 async def create_expense(
     amount: float = Form(...),
@@ -57,21 +67,41 @@ async def create_expense(
 
         expense.receipt_images.append(receipt)
 
+    publish_change(current_user.id, "expense", "created", expense.id, schemas.ExpenseOut.model_validate(expense))
     return expense
 
 
 @router.get("/", response_model=List[schemas.ExpenseOut])
 def list_expenses(
+    request: Request,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
-    expenses = (
-        db.query(models.Expense)
-        .filter(models.Expense.user_id == current_user.id)
-        .order_by(models.Expense.spent_at.desc())
-        .all()
-    )
-    return expenses
+    start, end = _naive_utc(start), _naive_utc(end)
+
+    query = db.query(models.Expense).filter(models.Expense.user_id == current_user.id)
+    if start:
+        query = query.filter(models.Expense.spent_at >= start)
+    if end:
+        query = query.filter(models.Expense.spent_at <= end)
+    expenses = query.order_by(models.Expense.spent_at.desc()).all()
+
+    # the archive is only read when a date range is asked for (the plain list
+    # stays hot-table only), and then only the month files inside that range
+    archived = read_archived_expenses(current_user.id, start, end) if start or end else []
+    if archived:
+        # an interrupted archive run leaves rows in both places until it is
+        # re-run; the MySQL row wins
+        hot_ids = {e.id for e in expenses}
+        archived = [row for row in archived if row["id"] not in hot_ids]
+        expenses = sorted(
+            expenses + archived,
+            key=lambda e: (e["spent_at"] if isinstance(e, dict) else e.spent_at) or datetime.min,
+            reverse=True,
+        )
+    return compact_response(request, expenses, schemas.ExpenseOut)
 
 
 @router.get("/{expense_id}", response_model=schemas.ExpenseOut)
@@ -85,6 +115,8 @@ def get_expense(
         .filter(models.Expense.id == expense_id, models.Expense.user_id == current_user.id)
         .first()
     )
+    if not expense:
+        expense = find_archived_expense(current_user.id, expense_id)
     if not expense:
         raise HTTPException(status_code=404, detail="Expense not found")
     return expense
@@ -131,6 +163,7 @@ async def update_expense(
 
     db.commit()
     db.refresh(expense)
+    publish_change(current_user.id, "expense", "updated", expense.id, schemas.ExpenseOut.model_validate(expense))
     return expense
 
 
@@ -150,6 +183,7 @@ def delete_expense(
 
     db.delete(expense)
     db.commit()
+    publish_change(current_user.id, "expense", "deleted", expense_id)
     return
 
 
@@ -168,10 +202,17 @@ def get_receipt_image(
         )
         .first()
     )
-    if not img:
-        raise HTTPException(status_code=404, detail="Image not found")
-
-    file_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "media", img.file_path)
+    if img:
+        rel_path = img.file_path
+    else:
+        # rows of archived expenses are gone from MySQL, but the files stay in media/
+        archived = find_archived_receipt(current_user.id, image_id)
+        if not archived:
+            raise HTTPException(status_code=404, detail="Image not found")
+        rel_path = archived["file_path"]
+
+    # file_path is stored relative to media/, e.g. "receipts/<name>.jpg"
+    file_path = os.path.join(os.path.dirname(MEDIA_ROOT), rel_path)
     if not os.path.exists(file_path):
         raise HTTPException(status_code=404, detail="File missing on server")
 
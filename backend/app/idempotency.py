@@ -0,0 +1,144 @@
+# backend/app/idempotency.py
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Protocol, Tuple
+from urllib.parse import urlencode
+
+from starlette.datastructures import UploadFile
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+from .middleware import HTTPMiddleware
+from .ratelimit import client_key
+
+IDEMPOTENCY_METHODS = ("POST", "PUT", "PATCH")
+IDEMPOTENCY_TTL = 24 * 60 * 60  # seconds a stored response can be replayed
+IDEMPOTENCY_MAX_ENTRIES = 10000
+
+
+class StoredResponse(NamedTuple):
+    fingerprint: str
+    status_code: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+    expires_at: float
+
+
+# what IdempotencyMiddleware needs from a backend; a shared one (e.g. Redis)
+# only has to implement these to replace InMemoryIdempotencyStore
+class IdempotencyStore(Protocol):
+    async def get(self, key: str) -> Optional[StoredResponse]: ...
+
+    async def put(self, key: str, stored: StoredResponse) -> None: ...
+
+
+# bounded LRU of first responses for a single worker process
+class InMemoryIdempotencyStore:
+    def __init__(self, max_entries: int = IDEMPOTENCY_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, StoredResponse]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[StoredResponse]:
+        stored = self.entries.get(key)
+        if stored is None:
+            return None
+        if stored.expires_at < time.time():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return stored
+
+    async def put(self, key: str, stored: StoredResponse) -> None:
+        self.entries[key] = stored
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+async def _fingerprint(request: Request) -> str:
+    digest = hashlib.sha256()
+    # PATCH /trips/{id}/status carries its whole change in ?status=
+    digest.update(urlencode(sorted(request.query_params.multi_items())).encode() + b"\0")
+
+    body = await request.body()
+    if not request.headers.get("content-type", "").startswith("multipart/form-data"):
+        digest.update(body)
+        return digest.hexdigest()
+
+    # multipart boundaries are random on every send, so a retry never has the
+    # same raw bytes -- hash the parsed fields and file contents instead
+    form = await request.form()
+    try:
+        for name, value in sorted(form.multi_items(), key=lambda item: item[0]):
+            digest.update(name.encode() + b"\0")
+            if isinstance(value, UploadFile):
+                digest.update((value.filename or "").encode() + b"\0")
+                digest.update(hashlib.sha256(await value.read()).digest())
+            else:
+                digest.update(value.encode() + b"\0")
+    finally:
+        await form.close()
+    return digest.hexdigest()
+
+
+def _replay(stored: StoredResponse) -> Response:
+    response = Response(content=stored.body, status_code=stored.status_code)
+    response.raw_headers = list(stored.headers) + [(b"idempotent-replayed", b"true")]
+    return response
+
+
+class IdempotencyMiddleware(HTTPMiddleware):
+    def __init__(self, app, store: Optional[IdempotencyStore] = None):
+        super().__init__(app)
+        self.store = store or InMemoryIdempotencyStore()
+        # requests currently executing, so concurrent duplicates wait instead of re-running
+        self.pending: Dict[str, asyncio.Event] = {}
+
+    async def dispatch(self, request: Request, call_next):
+        idempotency_key = request.headers.get("idempotency-key")
+        if request.method not in IDEMPOTENCY_METHODS or not idempotency_key:
+            return await call_next(request)
+
+        key = f"{client_key(request)}:{request.method}:{request.url.path}:{idempotency_key}"
+        fingerprint = await _fingerprint(request)
+
+        while True:
+            stored = await self.store.get(key)
+            if stored is not None:
+                if stored.fingerprint != fingerprint:
+                    return JSONResponse(
+                        status_code=422,
+                        content={"detail": "Idempotency-Key reused with a different request"},
+                    )
+                return _replay(stored)
+
+            running = self.pending.get(key)
+            if running is None:
+                break
+            # if the first attempt fails without storing a response, we run it ourselves
+            await running.wait()
+
+        done = asyncio.Event()
+        self.pending[key] = done
+        try:
+            response = await call_next(request)
+            body = b"".join([chunk async for chunk in response.body_iterator])
+
+            # 5xx and 429 are worth retrying, so they are not replayed
+            if response.status_code < 500 and response.status_code != 429:
+                await self.store.put(key, StoredResponse(
+                    fingerprint=fingerprint,
+                    status_code=response.status_code,
+                    headers=list(response.raw_headers),
+                    body=body,
+                    expires_at=time.time() + IDEMPOTENCY_TTL,
+                ))
+
+            result = Response(content=body, status_code=response.status_code)
+            result.raw_headers = list(response.raw_headers)
+            return result
+        finally:
+            del self.pending[key]
+            done.set()
@@ -1,10 +1,17 @@
 # backend/app/main.py
 import os
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.background import BackgroundTask
 
+from .auth import get_current_user_id
+from .changes import broker, change_stream
+from .compression import CompressionMiddleware
 from .database import Base, engine
+from .idempotency import IdempotencyMiddleware
+from .ratelimit import InMemoryLimiter, RateLimitMiddleware
 from . import models
 from .auth import router as auth_router
 from .expenses import router as expenses_router
@@ -16,7 +23,17 @@ Base.metadata.create_all(bind=engine)
 
 app = FastAPI(title="ExpeApp Backend")
 
-# CORS
+# per-user rate + concurrency limits (429 instead of queueing on the DB pool)
+limiter = InMemoryLimiter()
+app.add_middleware(RateLimitMiddleware, limiter=limiter)
+
+# replay the first response for retried POST/PUT/PATCH with the same Idempotency-Key
+app.add_middleware(IdempotencyMiddleware)
+
+# gzip/brotli for JSON responses, negotiated from Accept-Encoding
+app.add_middleware(CompressionMiddleware)
+
+# CORS -- added last so it wraps everything above, including 429s
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # can restrict later
@@ -42,3 +59,28 @@ app.include_router(reports_router)
 @app.get("/")
 def root():
     return {"message": "ExpeApp FastAPI backend running"}
+
+
+# per-user change feed (SSE) so clients stop refetching lists after every mutation
+@app.get("/changes")
+async def changes(request: Request, user_id: int = Depends(get_current_user_id)):
+    sub = broker.subscribe(user_id)
+    if sub is None:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many open change streams",
+            headers={"Retry-After": "30"},
+        )
+
+    return StreamingResponse(
+        change_stream(request, sub),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # also frees the slot if the client is gone before the stream starts
+        background=BackgroundTask(broker.unsubscribe, sub),
+    )
+
+
+@app.get("/metrics/limits")
+def limits_metrics():
+    return limiter.metrics()
@@ -0,0 +1,15 @@
+# backend/app/middleware.py
+from starlette.middleware.base import BaseHTTPMiddleware
+
+# long-lived streams skip these layers entirely: every BaseHTTPMiddleware adds
+# its own task group + memory stream per connection, which idle SSE clients
+# would hold for hours
+STREAM_PATHS = ("/changes",)
+
+
+class HTTPMiddleware(BaseHTTPMiddleware):
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in STREAM_PATHS:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
@@ -6,6 +6,7 @@ from sqlalchemy import (
     Float,
     DateTime,
     ForeignKey,
+    Index,
     Text,
 )
 from sqlalchemy.orm import relationship
@@ -50,6 +51,12 @@ class Expense(Base):
         passive_deletes=True
     )
 
+    # matches list_expenses (WHERE user_id = ? ORDER BY spent_at); old rows are
+    # moved out by app/archive.py so this index stays small
+    __table_args__ = (
+        Index("ix_expenses_user_spent_at", "user_id", "spent_at"),
+    )
+
 
 class ReceiptImage(Base):
     __tablename__ = "receipt_images"
@@ -0,0 +1,152 @@
+# backend/app/ratelimit.py
+import math
+import time
+from typing import Dict, NamedTuple, Optional, Protocol
+
+from jose import JWTError, jwt
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from .auth import ALGORITHM, SECRET_KEY
+from .middleware import HTTPMiddleware
+
+
+class Limit(NamedTuple):
+    rate: float        # tokens refilled per second
+    burst: int         # bucket size
+    concurrency: int   # requests in flight at once
+
+
+# per user, per route class
+LIMITS = {
+    "reads": Limit(rate=10, burst=40, concurrency=8),
+    "writes": Limit(rate=2, burst=10, concurrency=4),
+    "uploads": Limit(rate=0.5, burst=5, concurrency=2),
+}
+
+# /media is StaticFiles (receipt images, loaded without a token) and never
+# touches the DB pool this limiter protects
+EXEMPT_PREFIXES = ("/docs", "/redoc", "/openapi.json", "/metrics", "/media")
+
+# idle keys with a full bucket are dropped this often
+SWEEP_INTERVAL = 60
+
+
+def route_class(request: Request) -> str:
+    if request.method in ("GET", "HEAD"):
+        return "reads"
+    if request.headers.get("content-type", "").startswith("multipart/form-data"):
+        return "uploads"
+    return "writes"
+
+
+def client_key(request: Request) -> str:
+    # resolved from the JWT alone -- no DB session just to throttle
+    auth = request.headers.get("authorization", "")
+    scheme, _, token = auth.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            if payload.get("sub") is not None:
+                return f"user:{payload['sub']}"
+        except JWTError:
+            pass
+    host = request.client.host if request.client else "unknown"
+    return f"ip:{host}"
+
+
+# what RateLimitMiddleware needs from a backend; a shared one (e.g. Redis)
+# only has to implement these to replace InMemoryLimiter
+class Limiter(Protocol):
+    # 0 if admitted, otherwise seconds until a retry may succeed
+    async def acquire(self, key: str, klass: str, limit: Limit) -> float: ...
+
+    async def release(self, key: str) -> None: ...
+
+    def metrics(self) -> dict: ...
+
+
+# token buckets + in-flight counters for a single worker process
+class InMemoryLimiter:
+    def __init__(self):
+        self.buckets: Dict[str, list] = {}  # key -> [tokens, last_refill]
+        self.in_flight: Dict[str, int] = {}
+        self.counters = {
+            name: {"admitted": 0, "rejected_rate": 0, "rejected_concurrency": 0}
+            for name in LIMITS
+        }
+        self.last_sweep = time.monotonic()
+
+    async def acquire(self, key: str, klass: str, limit: Limit) -> float:
+        now = time.monotonic()
+        if now - self.last_sweep > SWEEP_INTERVAL:
+            self._sweep(now)
+
+        bucket = self.buckets.setdefault(key, [float(limit.burst), now])
+        bucket[0] = min(limit.burst, bucket[0] + (now - bucket[1]) * limit.rate)
+        bucket[1] = now
+
+        if self.in_flight.get(key, 0) >= limit.concurrency:
+            self.counters[klass]["rejected_concurrency"] += 1
+            return 1.0
+
+        if bucket[0] < 1:
+            self.counters[klass]["rejected_rate"] += 1
+            return (1 - bucket[0]) / limit.rate
+
+        bucket[0] -= 1
+        self.in_flight[key] = self.in_flight.get(key, 0) + 1
+        self.counters[klass]["admitted"] += 1
+        return 0.0
+
+    async def release(self, key: str) -> None:
+        count = self.in_flight.get(key, 0) - 1
+        if count > 0:
+            self.in_flight[key] = count
+        else:
+            self.in_flight.pop(key, None)
+
+    def metrics(self) -> dict:
+        return {
+            "classes": self.counters,
+            "in_flight": sum(self.in_flight.values()),
+            "tracked_keys": len(self.buckets),
+            "limits": {name: limit._asdict() for name, limit in LIMITS.items()},
+        }
+
+    def _sweep(self, now: float) -> None:
+        self.last_sweep = now
+        for key, (tokens, last) in list(self.buckets.items()):
+            klass = key.rsplit(":", 1)[-1]
+            limit = LIMITS.get(klass)
+            idle_full = limit is None or tokens + (now - last) * limit.rate >= limit.burst
+            if idle_full and key not in self.in_flight:
+                del self.buckets[key]
+
+
+class RateLimitMiddleware(HTTPMiddleware):
+    def __init__(self, app, limiter: Optional[Limiter] = None):
+        super().__init__(app)
+        self.limiter = limiter or InMemoryLimiter()
+
+    async def dispatch(self, request: Request, call_next):
+        # CORS preflights are answered by CORSMiddleware and never reach a route
+        if request.method == "OPTIONS" or request.url.path.startswith(EXEMPT_PREFIXES):
+            return await call_next(request)
+
+        klass = route_class(request)
+        key = f"{client_key(request)}:{klass}"
+
+        retry_after = await self.limiter.acquire(key, klass, LIMITS[klass])
+        if retry_after:
+            # reject right away instead of queueing behind the DB pool
+            return JSONResponse(
+                status_code=429,
+                content={"detail": "Too many requests"},
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+
+        try:
+            return await call_next(request)
+        finally:
+            await self.limiter.release(key)
@@ -1,10 +1,12 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 
 from . import models, schemas
 from .auth import get_current_user
+from .changes import publish_change
+from .compact import compact_response
 from .database import get_db
 
 router = APIRouter(prefix="/reports", tags=["reports"])
@@ -37,11 +39,13 @@ def create_report(
     db.add(report)
     db.commit()
     db.refresh(report)
+    publish_change(current_user.id, "report", "created", report.id, schemas.ReportOut.model_validate(report))
     return report
 
 
 @router.get("/", response_model=List[schemas.ReportOut])
 def list_reports(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
@@ -51,7 +55,7 @@ def list_reports(
         .order_by(models.Report.created_at.desc())
         .all()
     )
-    return reports
+    return compact_response(request, reports, schemas.ReportOut)
 
 
 @router.delete("/{report_id}", status_code=204)
@@ -70,6 +74,7 @@ def delete_report(
 
     db.delete(report)
     db.commit()
+    publish_change(current_user.id, "report", "deleted", report_id)
     return
 
 
@@ -91,4 +96,5 @@ def update_report_status(
     report.status = status
     db.commit()
     db.refresh(report)
+    publish_change(current_user.id, "report", "updated", report.id, schemas.ReportOut.model_validate(report))
     return report
@@ -1,10 +1,12 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 
 from . import models, schemas
 from .auth import get_current_user
+from .changes import publish_change
+from .compact import compact_response
 from .database import get_db
 
 router = APIRouter(prefix="/trips", tags=["trips"])
@@ -28,11 +30,13 @@ def create_trip(
     db.add(trip)
     db.commit()
     db.refresh(trip)
+    publish_change(current_user.id, "trip", "created", trip.id, schemas.TripOut.model_validate(trip))
     return trip
 
 
 @router.get("/", response_model=List[schemas.TripOut])
 def list_trips(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
@@ -42,7 +46,7 @@ def list_trips(
         .order_by(models.Trip.created_at.desc())
         .all()
     )
-    return trips
+    return compact_response(request, trips, schemas.TripOut)
 
 
 @router.delete("/{trip_id}", status_code=204)
@@ -59,8 +63,20 @@ def delete_trip(
     if not trip:
         raise HTTPException(status_code=404, detail="Trip not found")
 
+    # the DB sets reports.trip_id to NULL (passive_deletes), so clients need those too
+    report_ids = [
+        report_id
+        for (report_id,) in db.query(models.Report.id).filter(models.Report.trip_id == trip_id)
+    ]
+
     db.delete(trip)
     db.commit()
+    publish_change(current_user.id, "trip", "deleted", trip_id)
+
+    if report_ids:
+        reports = db.query(models.Report).filter(models.Report.id.in_(report_ids)).all()
+        for report in reports:
+            publish_change(current_user.id, "report", "updated", report.id, schemas.ReportOut.model_validate(report))
     return
 
 
@@ -82,4 +98,5 @@ def update_trip_status(
     trip.status = status
     db.commit()
     db.refresh(trip)
+    publish_change(current_user.id, "trip", "updated", trip.id, schemas.TripOut.model_validate(trip))
     return trip
@@ -0,0 +1,87 @@
+# backend/benchmarks/encoding.py
+#
+# Bytes-on-wire and encode time for GET /expenses/ in each format.
+# Run from backend/:  python -m benchmarks.encoding --rows 500
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from app import schemas
+from app.compact import msgpack, to_columns
+from app.compression import brotli, compress
+
+CATEGORIES = ["Food", "Travel", "Fuel", "Hotel", "Office Supplies", "Internet"]
+
+
+def fake_expenses(count: int) -> list:
+    start = datetime(2025, 1, 1)
+    rows = []
+    for i in range(1, count + 1):
+        rows.append({
+            "id": i,
+            "amount": round(random.uniform(50, 5000), 2),
+            "currency": "INR",
+            "category": random.choice(CATEGORIES),
+            "description": f"Merchant {random.randint(1, 40)}",
+            "ocr_text": None,
+            "spent_at": start + timedelta(hours=i * 7),
+            "created_at": start + timedelta(hours=i * 7, minutes=3),
+            "receipt_images": [{"id": i, "file_path": f"receipts/user1_exp{i}_1763604078_receipt.jpg"}],
+        })
+    return rows
+
+
+def encode_json(items):
+    # what the route's response_model produces today
+    data = [schemas.ExpenseOut.model_validate(i).model_dump(mode="json") for i in items]
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+def encode_columns_json(items):
+    return json.dumps(to_columns(items, schemas.ExpenseOut), separators=(",", ":")).encode()
+
+
+def encode_columns_msgpack(items):
+    return msgpack.packb(to_columns(items, schemas.ExpenseOut), use_bin_type=True)
+
+
+def timed(fn, *args, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return result, best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    random.seed(0)
+    items = fake_expenses(args.rows)
+
+    formats = [("json", encode_json), ("columns+json", encode_columns_json)]
+    if msgpack is not None:
+        formats.append(("columns+msgpack", encode_columns_msgpack))
+    encodings = ["identity", "gzip"] + (["br"] if brotli is not None else [])
+
+    print(f"{args.rows} expenses, best of {args.repeat}")
+    print(f"{'format':<18}{'encoding':<10}{'bytes':>10}{'encode ms':>12}")
+    for name, encoder in formats:
+        body, encode_ms = timed(encoder, items, repeat=args.repeat)
+        for encoding in encodings:
+            if encoding == "identity":
+                size, ms = len(body), encode_ms
+            else:
+                packed, compress_ms = timed(compress, body, encoding, repeat=args.repeat)
+                size, ms = len(packed), encode_ms + compress_ms
+            print(f"{name:<18}{encoding:<10}{size:>10}{ms:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# backend/tests/conftest.py
+import itertools
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import StaticPool
+
+from app import database
+
+# main.py creates the tables on import, so point it at SQLite before that happens
+database.engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+database.SessionLocal.configure(bind=database.engine)
+
+
+# MySQL enforces ON DELETE SET NULL/CASCADE; SQLite only does with this pragma
+@event.listens_for(database.engine, "connect")
+def _enable_foreign_keys(dbapi_connection, _):
+    dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+from app import archive, expenses, main  # noqa: E402
+
+_emails = (f"user{i}@example.com" for i in itertools.count(1))
+
+
+@pytest.fixture(autouse=True)
+def isolated_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(expenses, "MEDIA_ROOT", str(tmp_path / "receipts"))
+    monkeypatch.setattr(archive, "ARCHIVE_ROOT", str(tmp_path / "archive"))
+    (tmp_path / "receipts").mkdir()
+    # signup/login share the test client's IP bucket across tests
+    main.limiter.buckets.clear()
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+
+@pytest.fixture
+def auth_headers(client):
+    email = next(_emails)
+    client.post("/auth/signup", json={"email": email, "password": "secret"})
+    res = client.post("/auth/login", data={"username": email, "password": "secret"})
+    return {"Authorization": f"Bearer {res.json()['access_token']}"}
@@ -0,0 +1,71 @@
+# backend/tests/test_archive.py
+from datetime import datetime
+
+import pytest
+
+from app import archive, database, models
+
+CUTOFF = datetime(2021, 1, 1)
+
+
+def _create(client, headers, spent_at, image=b"receipt-bytes"):
+    files = {"image": ("receipt.jpg", image, "image/jpeg")}
+    res = client.post("/expenses/", data={"amount": "12", "spent_at": spent_at}, files=files, headers=headers)
+    assert res.status_code == 200
+    return res.json()
+
+
+def _archive():
+    db = database.SessionLocal()
+    try:
+        return archive.archive_expenses(db, CUTOFF)
+    finally:
+        db.close()
+
+
+def test_archived_expenses_read_through(client, auth_headers):
+    old = _create(client, auth_headers, "2020-01-05T10:00:00")
+    _create(client, auth_headers, "2020-03-01T00:00:00")
+    new = _create(client, auth_headers, "2030-01-01T00:00:00")
+
+    assert _archive() == 2
+
+    plain = client.get("/expenses/", headers=auth_headers).json()
+    assert [e["id"] for e in plain] == [new["id"]]
+
+    ranged = client.get("/expenses/?end=2020-02-01T00:00:00", headers=auth_headers).json()
+    assert [e["id"] for e in ranged] == [old["id"]]
+
+    res = client.get(f"/expenses/{old['id']}", headers=auth_headers)
+    assert res.status_code == 200
+    assert res.json()["spent_at"] == "2020-01-05T10:00:00"
+
+    image_id = old["receipt_images"][0]["id"]
+    res = client.get(f"/expenses/receipt/{image_id}", headers=auth_headers)
+    assert res.status_code == 200
+    assert res.content == b"receipt-bytes"
+
+
+def test_rerun_after_interrupted_archive(client, auth_headers, monkeypatch):
+    old = _create(client, auth_headers, "2020-06-01T00:00:00")
+
+    # files and index are written, then the delete fails to commit
+    db = database.SessionLocal()
+    monkeypatch.setattr(db, "commit", lambda: (_ for _ in ()).throw(RuntimeError("boom")))
+    with pytest.raises(RuntimeError):
+        archive.archive_expenses(db, CUTOFF)
+    db.rollback()
+    db.close()
+
+    ranged = client.get("/expenses/?end=2020-12-31T00:00:00", headers=auth_headers).json()
+    assert [e["id"] for e in ranged] == [old["id"]]
+
+    assert _archive() == 1
+    ranged = client.get("/expenses/?end=2020-12-31T00:00:00", headers=auth_headers).json()
+    assert [e["id"] for e in ranged] == [old["id"]]
+
+    db = database.SessionLocal()
+    try:
+        assert db.query(models.Expense).filter(models.Expense.id == old["id"]).count() == 0
+    finally:
+        db.close()
@@ -0,0 +1,158 @@
+# backend/tests/test_changes.py
+import asyncio
+import json
+
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app import changes
+from app.changes import ChangeBroker, Subscription, broker, change_stream, publish_change
+
+
+class FakeRequest:
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+
+def _data(chunk: str) -> dict:
+    assert chunk.startswith("data: ")
+    return json.loads(chunk[len("data: "):])
+
+
+def test_stream_delivers_published_changes_and_unsubscribes_on_disconnect():
+    async def scenario():
+        request = FakeRequest()
+        stream = change_stream(request, broker.subscribe(7))
+
+        assert _data(await stream.__anext__()) == {"seq": 1, "op": "resync"}
+        assert len(broker.subscribers[7]) == 1
+
+        publish_change(7, "trip", "deleted", 3)
+        publish_change(8, "trip", "deleted", 4)  # another user's change is not delivered
+        assert _data(await stream.__anext__()) == {
+            "seq": 2, "entity": "trip", "op": "deleted", "id": 3,
+        }
+
+        request.disconnected = True
+        publish_change(7, "trip", "deleted", 5)
+        try:
+            await stream.__anext__()
+        except StopAsyncIteration:
+            pass
+        assert 7 not in broker.subscribers
+
+    asyncio.run(scenario())
+
+
+def test_overflow_replaces_buffer_with_resync():
+    async def scenario():
+        sub = Subscription(user_id=1, buffer_size=3)
+        for i in range(5):
+            sub.offer({"entity": "expense", "op": "created", "id": i})
+
+        events = [sub.queue.get_nowait() for _ in range(sub.queue.qsize())]
+        # the 4th event found the buffer full: everything buffered (and it) is
+        # dropped for a resync, so the client sees a gap in seq and refetches
+        assert events == [
+            {"seq": 5, "op": "resync"},
+            {"seq": 6, "entity": "expense", "op": "created", "id": 4},
+        ]
+
+    asyncio.run(scenario())
+
+
+def test_seq_is_per_subscription():
+    async def scenario():
+        local = ChangeBroker()
+        a = local.subscribe(1)
+        b = local.subscribe(2)
+        for _ in range(3):
+            local.publish(2, {"op": "updated"})
+        local.publish(1, {"op": "updated"})
+
+        assert a.queue.get_nowait()["seq"] == 1
+        assert [b.queue.get_nowait()["seq"] for _ in range(3)] == [1, 2, 3]
+
+    asyncio.run(scenario())
+
+
+def test_changes_requires_auth(client):
+    assert client.get("/changes").status_code == 401
+
+
+def test_subscribe_is_capped_per_user():
+    async def scenario():
+        local = ChangeBroker(max_streams=2)
+        first = local.subscribe(1)
+        assert local.subscribe(1) is not None
+        assert local.subscribe(1) is None
+        assert local.subscribe(2) is not None  # other users are unaffected
+
+        local.unsubscribe(first)
+        assert local.subscribe(1) is not None
+
+    asyncio.run(scenario())
+
+
+def _user_id(client, headers):
+    return client.get("/auth/me", headers=headers).json()["id"]
+
+
+def test_changes_returns_429_over_the_stream_cap(client, auth_headers):
+    user_id = _user_id(client, auth_headers)
+    full = {Subscription(user_id, 1) for _ in range(changes.MAX_STREAMS_PER_USER)}
+    broker.subscribers[user_id] = full
+    try:
+        res = client.get("/changes", headers=auth_headers)
+    finally:
+        del broker.subscribers[user_id]
+
+    assert res.status_code == 429
+    assert res.headers["retry-after"] == "30"
+
+
+def test_changes_skips_base_http_middleware(client, monkeypatch, auth_headers):
+    paths = []
+    original = BaseHTTPMiddleware.__call__
+
+    async def spy(self, scope, receive, send):
+        paths.append(scope["path"])
+        await original(self, scope, receive, send)
+
+    async def one_event(request, sub):
+        yield 'data: {"op":"resync"}\n\n'
+
+    monkeypatch.setattr(BaseHTTPMiddleware, "__call__", spy)
+    monkeypatch.setattr("app.main.change_stream", one_event)
+
+    client.get("/trips/", headers=auth_headers)
+    assert paths, "spy should see ordinary requests"
+
+    paths.clear()
+    res = client.get("/changes", headers=auth_headers)
+    assert res.status_code == 200
+    assert res.text == 'data: {"op":"resync"}\n\n'
+    assert paths == []
+    # the subscription taken by the endpoint is released once the response ends
+    assert _user_id(client, auth_headers) not in broker.subscribers
+
+
+def test_deleting_trip_publishes_its_reports(client, monkeypatch, auth_headers):
+    trip = client.post("/trips/", json={"name": "Delhi"}, headers=auth_headers).json()
+    report = client.post(
+        "/reports/", json={"report_name": "Q1", "trip_id": trip["id"]}, headers=auth_headers,
+    ).json()
+
+    events = []
+    monkeypatch.setattr(
+        "app.trips.publish_change",
+        lambda user_id, entity, op, entity_id, data=None: events.append((entity, op, entity_id, data)),
+    )
+    assert client.delete(f"/trips/{trip['id']}", headers=auth_headers).status_code == 204
+
+    assert events[0][:3] == ("trip", "deleted", trip["id"])
+    entity, op, entity_id, data = events[1]
+    assert (entity, op, entity_id) == ("report", "updated", report["id"])
+    assert data.trip_id is None
@@ -0,0 +1,34 @@
+# backend/tests/test_compact.py
+import pytest
+
+from app.compact import COLUMNS_JSON, COLUMNS_MSGPACK, choose_list_format
+
+
+@pytest.mark.parametrize("accept, expected", [
+    ("", "application/json"),
+    ("application/json, text/plain, */*", "application/json"),
+    ("*/*", "application/json"),
+    ("application/*", "application/json"),
+    (COLUMNS_JSON, COLUMNS_JSON),
+    (f"application/json, {COLUMNS_JSON};q=0", "application/json"),
+    (f"application/json;q=0.5, {COLUMNS_MSGPACK};q=0.9", COLUMNS_MSGPACK),
+    (f"application/json, {COLUMNS_JSON};q=0.5", "application/json"),
+    (f"{COLUMNS_JSON}; charset=utf-8; q=0.8", COLUMNS_JSON),
+])
+def test_choose_list_format(accept, expected):
+    assert choose_list_format(accept) == expected
+
+
+def test_msgpack_not_offered_without_the_package(monkeypatch):
+    monkeypatch.setattr("app.compact.msgpack", None)
+    assert choose_list_format(COLUMNS_MSGPACK) == "application/json"
+
+
+def test_list_endpoint_varies_on_accept(client, auth_headers):
+    res = client.get("/trips/", headers={**auth_headers, "Accept": COLUMNS_JSON})
+
+    assert res.headers["content-type"] == COLUMNS_JSON
+    assert "Accept" in res.headers["vary"]
+    assert res.json() == {"columns": [
+        "name", "purpose", "travel_type", "from_date", "to_date", "status", "id", "created_at",
+    ], "rows": []}
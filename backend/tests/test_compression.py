@@ -0,0 +1,81 @@
+# backend/tests/test_compression.py
+import pytest
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app import compression
+from app.compression import CompressionMiddleware, choose_encoding
+
+BIG = {"rows": ["x" * 2000]}
+SMALL = {"ok": True}
+
+
+@pytest.fixture
+def app_client():
+    app = FastAPI()
+
+    @app.get("/big")
+    def big():
+        response = JSONResponse(BIG)
+        response.set_cookie("a", "1")
+        response.set_cookie("b", "2")
+        return response
+
+    @app.get("/small")
+    def small():
+        return SMALL
+
+    app.add_middleware(CompressionMiddleware)
+    app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_credentials=True)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", "br"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("identity", None),
+    ("gzip;q=0", None),
+    ("*", "br"),
+    ("", None),
+])
+def test_choose_encoding(header, expected):
+    assert choose_encoding(header) == expected
+
+
+def test_br_falls_back_to_gzip_without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert choose_encoding("br, gzip") == "gzip"
+    assert choose_encoding("br") is None
+
+
+def test_large_json_is_compressed(app_client):
+    res = app_client.get("/big", headers={"Accept-Encoding": "gzip"})
+
+    assert res.headers["content-encoding"] == "gzip"
+    assert int(res.headers["content-length"]) < 2000
+    assert res.json() == BIG
+
+
+def test_vary_keeps_origin_and_adds_accept_encoding(app_client):
+    res = app_client.get("/big", headers={"Accept-Encoding": "gzip", "Origin": "http://x.test"})
+
+    vary = {v.strip() for v in res.headers["vary"].split(",")}
+    assert {"Origin", "Accept-Encoding"} <= vary
+
+
+def test_repeated_set_cookie_headers_survive(app_client):
+    res = app_client.get("/big", headers={"Accept-Encoding": "gzip"})
+
+    cookies = res.headers.get_list("set-cookie")
+    assert len(cookies) == 2
+    assert res.cookies["a"] == "1" and res.cookies["b"] == "2"
+
+
+def test_small_bodies_are_not_encoded(app_client):
+    res = app_client.get("/small", headers={"Accept-Encoding": "gzip, br"})
+
+    assert "content-encoding" not in res.headers
+    assert "Accept-Encoding" in res.headers["vary"]
+    assert res.json() == SMALL
@@ -0,0 +1,95 @@
+# backend/tests/test_idempotency.py
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from app import database, models
+from app.idempotency import IdempotencyMiddleware
+
+
+def _expense_count():
+    db = database.SessionLocal()
+    try:
+        return db.query(models.Expense).count()
+    finally:
+        db.close()
+
+
+def _receipt():
+    # a fresh dict each time: httpx picks a new multipart boundary per request
+    return {"image": ("receipt.jpg", b"\xff\xd8fake-jpeg", "image/jpeg")}
+
+
+def test_multipart_create_is_replayed(client, auth_headers):
+    headers = {**auth_headers, "Idempotency-Key": "create-1"}
+    before = _expense_count()
+
+    first = client.post("/expenses/", data={"amount": "42.5"}, files=_receipt(), headers=headers)
+    retry = client.post("/expenses/", data={"amount": "42.5"}, files=_receipt(), headers=headers)
+
+    assert first.status_code == 200
+    assert retry.status_code == 200
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert retry.json() == first.json()
+    assert _expense_count() == before + 1
+
+
+def test_key_reused_with_different_file_is_rejected(client, auth_headers):
+    headers = {**auth_headers, "Idempotency-Key": "create-2"}
+
+    client.post("/expenses/", data={"amount": "10"}, files=_receipt(), headers=headers)
+    other = {"image": ("receipt.jpg", b"another-image", "image/jpeg")}
+    res = client.post("/expenses/", data={"amount": "10"}, files=other, headers=headers)
+
+    assert res.status_code == 422
+
+
+def test_json_create_is_replayed(client, auth_headers):
+    headers = {**auth_headers, "Idempotency-Key": "trip-1"}
+
+    first = client.post("/trips/", json={"name": "Goa"}, headers=headers)
+    retry = client.post("/trips/", json={"name": "Goa"}, headers=headers)
+
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert retry.json()["id"] == first.json()["id"]
+
+
+def test_key_reused_with_different_query_is_rejected(client, auth_headers):
+    trip = client.post("/trips/", json={"name": "Pune"}, headers=auth_headers).json()
+    headers = {**auth_headers, "Idempotency-Key": "status-1"}
+
+    first = client.patch(f"/trips/{trip['id']}/status?status=approved", headers=headers)
+    other = client.patch(f"/trips/{trip['id']}/status?status=rejected", headers=headers)
+    retry = client.patch(f"/trips/{trip['id']}/status?status=approved", headers=headers)
+
+    assert first.json()["status"] == "approved"
+    assert other.status_code == 422
+    assert retry.headers["idempotent-replayed"] == "true"
+
+
+def test_concurrent_duplicates_execute_once():
+    calls = []
+    app = FastAPI()
+
+    @app.post("/slow")
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return {"calls": len(calls)}
+
+    app.add_middleware(IdempotencyMiddleware)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await asyncio.gather(*[
+                http.post("/slow", json={}, headers={"Idempotency-Key": "same"})
+                for _ in range(3)
+            ])
+
+    responses = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert [r.json() for r in responses] == [{"calls": 1}] * 3
+    assert sum(r.headers.get("idempotent-replayed") == "true" for r in responses) == 2
@@ -0,0 +1,157 @@
+# backend/tests/test_ratelimit.py
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from app import ratelimit
+from app.ratelimit import InMemoryLimiter, Limit, RateLimitMiddleware, route_class
+
+WRITES = Limit(rate=2, burst=3, concurrency=10)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit, "time", clock)
+    return clock
+
+
+def _acquire(limiter, key, klass, limit):
+    return asyncio.run(limiter.acquire(key, klass, limit))
+
+
+def test_bucket_refills_at_rate(clock):
+    limiter = InMemoryLimiter()
+    key = "user:1:writes"
+
+    assert [_acquire(limiter, key, "writes", WRITES) for _ in range(3)] == [0, 0, 0]
+    # empty bucket: one token needs 1 / rate seconds
+    assert _acquire(limiter, key, "writes", WRITES) == pytest.approx(0.5)
+
+    clock.now += 0.25
+    assert _acquire(limiter, key, "writes", WRITES) == pytest.approx(0.25)
+
+    clock.now += 0.25
+    assert _acquire(limiter, key, "writes", WRITES) == 0
+
+    # refill is capped at the burst size
+    clock.now += 60
+    assert [_acquire(limiter, key, "writes", WRITES) for _ in range(4)][-1] > 0
+
+
+def test_concurrency_limit_and_release(clock):
+    limiter = InMemoryLimiter()
+    limit = Limit(rate=100, burst=100, concurrency=2)
+    key = "user:1:uploads"
+
+    assert _acquire(limiter, key, "uploads", limit) == 0
+    assert _acquire(limiter, key, "uploads", limit) == 0
+    assert _acquire(limiter, key, "uploads", limit) == 1.0
+
+    asyncio.run(limiter.release(key))
+    assert _acquire(limiter, key, "uploads", limit) == 0
+    assert limiter.metrics()["classes"]["uploads"]["rejected_concurrency"] == 1
+
+
+def test_sweep_drops_idle_keys_only(clock):
+    limiter = InMemoryLimiter()
+    _acquire(limiter, "user:1:reads", "reads", ratelimit.LIMITS["reads"])
+    _acquire(limiter, "user:2:reads", "reads", ratelimit.LIMITS["reads"])
+    asyncio.run(limiter.release("user:1:reads"))
+
+    limiter._sweep(clock.now + ratelimit.SWEEP_INTERVAL)
+
+    # user 1 is idle with a refilled bucket, user 2 still has a request in flight
+    assert list(limiter.buckets) == ["user:2:reads"]
+
+
+@pytest.mark.parametrize("method, content_type, expected", [
+    ("GET", "", "reads"),
+    ("HEAD", "", "reads"),
+    ("POST", "application/json", "writes"),
+    ("PATCH", "", "writes"),
+    ("POST", "multipart/form-data; boundary=x", "uploads"),
+    ("PUT", "multipart/form-data; boundary=x", "uploads"),
+])
+def test_route_class(method, content_type, expected):
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": "/",
+        "headers": [(b"content-type", content_type.encode())],
+    }
+    assert route_class(Request(scope)) == expected
+
+
+@pytest.fixture
+def limited(monkeypatch, clock):
+    monkeypatch.setitem(ratelimit.LIMITS, "reads", Limit(rate=1000, burst=1, concurrency=5))
+    monkeypatch.setitem(ratelimit.LIMITS, "writes", Limit(rate=0.001, burst=1, concurrency=5))
+    limiter = InMemoryLimiter()
+    app = FastAPI()
+
+    @app.get("/items")
+    def items():
+        return []
+
+    @app.post("/items")
+    def create_item():
+        return {}
+
+    @app.get("/boom")
+    def boom():
+        raise RuntimeError("route failed")
+
+    @app.get("/media/receipt.jpg")
+    def media():
+        return {}
+
+    app.add_middleware(RateLimitMiddleware, limiter=limiter)
+    return TestClient(app, raise_server_exceptions=False), limiter
+
+
+def test_429_retry_after_is_never_zero(limited):
+    client, _ = limited
+    assert client.get("/items").status_code == 200
+
+    # the bucket refills in ~1ms, which must still round up to 1 second
+    res = client.get("/items")
+    assert res.status_code == 429
+    assert res.headers["retry-after"] == "1"
+
+
+def test_classes_are_keyed_separately(limited):
+    client, limiter = limited
+    assert client.post("/items").status_code == 200
+    res = client.post("/items")
+    assert res.status_code == 429
+    assert int(res.headers["retry-after"]) >= 1
+
+    # writes are exhausted, reads for the same client are not
+    assert client.get("/items").status_code == 200
+    assert {key.rsplit(":", 1)[-1] for key in limiter.buckets} == {"reads", "writes"}
+
+
+def test_slot_released_when_route_raises(limited):
+    client, limiter = limited
+    assert client.get("/boom").status_code == 500
+    assert limiter.in_flight == {}
+
+
+def test_options_and_media_are_exempt(limited):
+    client, limiter = limited
+    for _ in range(5):
+        assert client.options("/items").status_code != 429
+        assert client.get("/media/receipt.jpg").status_code == 200
+    assert limiter.buckets == {}
@@ -13,7 +13,37 @@ api.interceptors.request.use(async (config) => {
     config.headers = config.headers || {};
     config.headers.Authorization = `Bearer ${token}`;
   }
+  // same key on every retry of this request, so the backend replays instead of re-inserting
+  const method = (config.method || "get").toLowerCase();
+  if (["post", "put", "patch"].includes(method)) {
+    config.headers = config.headers || {};
+    if (!config.headers["Idempotency-Key"]) {
+      config.headers["Idempotency-Key"] =
+        `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+    }
+  }
   return config;
 });
 
+// retry requests that never got a response (flaky mobile network). POST/PUT/PATCH
+// reuse the config above, so the same Idempotency-Key is sent and the backend
+// replays the first result instead of inserting again.
+const MAX_RETRIES = 2;
+
+api.interceptors.response.use(undefined, async (error) => {
+  const config = error.config;
+  if (!config || error.response) {
+    return Promise.reject(error);
+  }
+  const method = (config.method || "get").toLowerCase();
+  const retryable = method === "get" || !!config.headers?.["Idempotency-Key"];
+  config.__retryCount = config.__retryCount || 0;
+  if (!retryable || config.__retryCount >= MAX_RETRIES) {
+    return Promise.reject(error);
+  }
+  config.__retryCount += 1;
+  await new Promise((resolve) => setTimeout(resolve, 1000 * config.__retryCount));
+  return api(config);
+});
+
 export default api;